@@ -2,11 +2,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Dict, Tuple
 import plotly.express as px
+import plotly.graph_objects as go
 import sqlite3
 import os
 
+# Rent-to-income ratio tiers and their affordability scores
+AFFORDABILITY_RATIO_TIERS = np.array([0.25, 0.30, 0.35, 0.40])
+AFFORDABILITY_TIER_SCORES = np.array([100, 85, 70, 50], dtype=np.float32)
+
 # Simplified helper classes
 class DataProcessor:
     """Simple data processor for affordability calculations."""
@@ -28,113 +33,145 @@ class DataProcessor:
             return 50
         else:
             return max(0, 100 - (rent_to_income_ratio - 0.3) * 200)
+    
+    def calculate_affordability_index_vec(self, rent: np.ndarray, income: np.ndarray,
+                                          out: np.ndarray = None) -> np.ndarray:
+        """Calculate affordability scores (0-100) for whole rent/income arrays at once."""
+        if out is None:
+            out = np.empty(len(rent), dtype=np.float32)
+        monthly_income = income / 12
+        ratio = np.divide(rent, monthly_income, out=np.full(len(rent), np.inf), where=monthly_income > 0)
+        
+        # One binary search per element picks the tier; only ratios above the last tier need the formula
+        tier = np.searchsorted(AFFORDABILITY_RATIO_TIERS, ratio)
+        over = tier == len(AFFORDABILITY_RATIO_TIERS)
+        out[~over] = AFFORDABILITY_TIER_SCORES[tier[~over]]
+        out[over] = np.maximum(0, 100 - (ratio[over] - 0.3) * 200)
+        return out
 
 class NeighborhoodAnalyzer:
     """Simple neighborhood analyzer."""
     
+    SCORE_COLUMNS = ['affordability', 'amenity_score', 'transit_score',
+                     'safety_score', 'school_score', 'growth_potential']
+    
+    DEFAULT_WEIGHTS = {
+        'affordability': 0.3,
+        'amenities': 0.2,
+        'transit': 0.2,
+        'safety': 0.2,
+        'schools': 0.1,
+        'growth': 0.1
+    }
+    
+    def _weight_vector(self, weights: Dict) -> np.ndarray:
+        """Weights in SCORE_COLUMNS order."""
+        return np.array([
+            weights['affordability'],
+            weights['amenities'],
+            weights['transit'],
+            weights['safety'],
+            weights.get('schools', 0.1),
+            weights['growth']
+        ])
+    
     def rank_neighborhoods(self, df: pd.DataFrame, weights: Dict = None) -> pd.DataFrame:
         """Rank neighborhoods by value score."""
         if weights is None:
-            weights = {
-                'affordability': 0.3,
-                'amenities': 0.2,
-                'transit': 0.2,
-                'safety': 0.2,
-                'schools': 0.1,
-                'growth': 0.1
-            }
+            weights = self.DEFAULT_WEIGHTS
         
         # Ensure school_score exists
         if 'school_score' not in df.columns:
             df['school_score'] = 75.0  # Default value
         
-        df['value_score'] = (
-            df['affordability'] * weights['affordability'] +
-            df['amenity_score'] * weights['amenities'] +
-            df['transit_score'] * weights['transit'] +
-            df['safety_score'] * weights['safety'] +
-            df['school_score'] * weights.get('schools', 0.1) +
-            df['growth_potential'] * weights['growth']
-        )
+        # Weighted sum as a single (N, 6) @ (6,) product
+        scores = df[self.SCORE_COLUMNS].to_numpy(dtype=np.float64) @ self._weight_vector(weights)
         
-        df = df.sort_values('value_score', ascending=False)
-        df['rank'] = range(1, len(df) + 1)
+        # Order rows by score (stable for ties) and write the sorted scores onto the reordered copy
+        order = np.argsort(-scores, kind='stable')
+        df = df.take(order).reset_index(drop=True)
+        df['value_score'] = scores[order]
+        df['rank'] = np.arange(1, len(df) + 1)
         
         return df
-
-class Visualizer:
-    """Simple visualizer using Plotly."""
     
-    def create_california_overview_chart(self, df: pd.DataFrame, top_n: int = 10):
-        """Graph 1: Overall California view - Top 10 counties by average rental score."""
-        df_copy = df.copy()
-        df_copy['county'] = df_copy['name'].str.extract(r'\(([^)]+)\)')[0]
+    def find_best_value_neighborhoods(self, df: pd.DataFrame, max_rent: float, weights: Dict = None,
+                                      top_n: int = 10, county: str = None) -> Tuple[pd.DataFrame, Dict]:
+        """Score, budget-filter and keep the top_n neighborhoods in one pass.
         
-        county_data = df_copy.groupby('county').agg({
-            'value_score': 'mean',
-            'median_rent': 'mean',
-            'affordability': 'mean'
-        }).reset_index()
+        Only rows within budget are scored, and only the top_n are sorted. Returns the top_n
+        frame and a dict summarizing every matching row: count and mean rent, value score
+        and affordability.
+        """
+        if weights is None:
+            weights = self.DEFAULT_WEIGHTS
+        if 'school_score' not in df.columns:
+            df = df.assign(school_score=75.0)  # Default value
         
-        county_data = county_data.sort_values('value_score', ascending=False).head(top_n)
+        rent = df['median_rent'].to_numpy()
+        mask = rent <= max_rent
+        if county is not None:
+            mask &= (df['county'] == county).to_numpy()
+        matched = np.flatnonzero(mask)
         
-        fig = px.bar(
-            county_data,
-            x='county',
-            y='value_score',
-            color='value_score',
-            labels={'value_score': 'Average Rental Score', 'county': 'County'},
-            color_continuous_scale='Blues',
-            text='value_score',
-            title='Top 10 California Counties by Average Rental Score'
-        )
-        fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig.update_layout(
+        scores = df[self.SCORE_COLUMNS].to_numpy(dtype=np.float64)[matched] @ self._weight_vector(weights)
+        
+        # Partial selection of the best top_n, then a small sort of just those
+        top_n = min(top_n, len(matched))
+        best = np.arange(len(matched))
+        if top_n < len(matched):
+            best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        
+        result = df.take(matched[best]).reset_index(drop=True)
+        result['value_score'] = scores[best]
+        result['rank'] = np.arange(1, len(result) + 1)
+        
+        matches = {'count': len(matched)}
+        if len(matched) > 0:
+            matches['median_rent'] = float(rent[matched].mean())
+            matches['value_score'] = float(scores.mean())
+            matches['affordability'] = float(df['affordability'].to_numpy()[matched].mean())
+        
+        return result, matches
+
+class Visualizer:
+    """Simple visualizer using Plotly.
+    
+    Chart methods read the `county` column added by load_sample_data and never copy their input.
+    """
+    
+    def __init__(self):
+        """Build the shared single-trace bar chart template once."""
+        self.bar_template = go.Figure(go.Bar(textposition='outside')).update_layout(
             height=500,
             showlegend=False,
-            xaxis_tickangle=-45,
-            xaxis_title='County',
-            yaxis_title='Average Rental Score'
+            xaxis_tickangle=-45
         )
-        return fig
     
-    def create_county_neighborhoods_chart(self, df: pd.DataFrame, county: str, top_n: int = 5):
-        """Graph 2: Filtered county view - Top 5 neighborhoods in selected county."""
-        df_copy = df.copy()
-        df_copy['county'] = df_copy['name'].str.extract(r'\(([^)]+)\)')[0]
+    def _bar_chart(self, x: np.ndarray, y: np.ndarray, colorscale: str, x_label: str,
+                   y_label: str, title: str = None, hover: Dict = None):
+        """Fill a copy of the bar template with raw arrays (hover maps label -> (array, d3 format))."""
+        fig = go.Figure(self.bar_template)
+        bar = fig.data[0]
+        bar.x = x
+        bar.y = y
+        bar.text = np.char.mod('%.1f', y)
+        bar.marker = dict(color=y, colorscale=colorscale, showscale=True, colorbar=dict(title=y_label))
         
-        county_neighborhoods = df_copy[df_copy['county'] == county].copy()
-        county_neighborhoods = county_neighborhoods.sort_values('value_score', ascending=False).head(top_n)
+        hovertemplate = f'{x_label}=%{{x}}<br>{y_label}=%{{y:.1f}}'
+        if hover:
+            bar.customdata = np.column_stack([values for values, _ in hover.values()])
+            for i, (label, (_, fmt)) in enumerate(hover.items()):
+                hovertemplate += f'<br>{label}=%{{customdata[{i}]:{fmt}}}'
+        bar.hovertemplate = hovertemplate + '<extra></extra>'
         
-        fig = px.bar(
-            county_neighborhoods,
-            x='name',
-            y='value_score',
-            color='value_score',
-            labels={'value_score': 'Rental Score', 'name': 'Neighborhood'},
-            color_continuous_scale='Viridis',
-            text='value_score',
-            title=f'Top 5 Neighborhoods in {county}',
-            hover_data={'median_rent': ':$,.0f', 'affordability': ':.1f'}
-        )
-        fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig.update_layout(
-            height=500,
-            showlegend=False,
-            xaxis_tickangle=-45,
-            xaxis_title='Neighborhood',
-            yaxis_title='Rental Score'
-        )
+        fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
         return fig
     
-    def create_county_comparison_chart(self, df: pd.DataFrame, top_n: int = 10):
-        """Create vertical bar chart for county-level value comparison (dynamic based on filters)."""
-        # Extract county from neighborhood name
-        df_copy = df.copy()
-        df_copy['county'] = df_copy['name'].str.extract(r'\(([^)]+)\)')[0]
-        
-        # Aggregate by county
-        county_data = df_copy.groupby('county').agg({
+    def aggregate_counties(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Average every score column by county (shared input for the county-level charts)."""
+        return df.groupby('county', sort=False, observed=True).agg({
             'value_score': 'mean',
             'affordability': 'mean',
             'amenity_score': 'mean',
@@ -143,35 +180,64 @@ class Visualizer:
             'growth_potential': 'mean',
             'median_rent': 'mean'
         }).reset_index()
+    
+    def create_california_overview_chart(self, df: pd.DataFrame, top_n: int = 10,
+                                         county_agg: pd.DataFrame = None):
+        """Graph 1: Overall California view - Top 10 counties by average rental score."""
+        if county_agg is None:
+            county_agg = self.aggregate_counties(df)
         
-        county_data = county_data.sort_values('value_score', ascending=False).head(top_n)
+        county_data = county_agg.nlargest(top_n, 'value_score')
         
-        fig = px.bar(
-            county_data,
-            x='county',
-            y='value_score',
-            color='value_score',
-            labels={'value_score': 'Average Value Score', 'county': 'County/City'},
-            color_continuous_scale='Blues',
-            text='value_score'
+        return self._bar_chart(
+            county_data['county'].to_numpy(),
+            county_data['value_score'].to_numpy(),
+            colorscale='Blues',
+            x_label='County',
+            y_label='Average Rental Score',
+            title='Top 10 California Counties by Average Rental Score'
         )
-        fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig.update_layout(
-            height=500,
-            showlegend=False,
-            xaxis_tickangle=-45,
-            xaxis_title='County/City',
-            yaxis_title='Average Value Score',
+    
+    def create_county_neighborhoods_chart(self, df: pd.DataFrame, county: str, top_n: int = 5):
+        """Graph 2: Filtered county view - Top 5 neighborhoods in selected county."""
+        # Partial selection of the top rows instead of sorting the whole county
+        county_neighborhoods = df[df['county'] == county].nlargest(top_n, 'value_score')
+        
+        return self._bar_chart(
+            county_neighborhoods['name'].to_numpy(),
+            county_neighborhoods['value_score'].to_numpy(),
+            colorscale='Viridis',
+            x_label='Neighborhood',
+            y_label='Rental Score',
+            title=f'Top {top_n} Neighborhoods in {county}',
+            hover={
+                'Median Rent': (county_neighborhoods['median_rent'].to_numpy(), '$,.0f'),
+                'Affordability': (county_neighborhoods['affordability'].to_numpy(), '.1f')
+            }
+        )
+    
+    def create_county_comparison_chart(self, df: pd.DataFrame, top_n: int = 10,
+                                       county_agg: pd.DataFrame = None):
+        """Create vertical bar chart for county-level value comparison (dynamic based on filters)."""
+        # Aggregate by county unless the caller already did
+        if county_agg is None:
+            county_agg = self.aggregate_counties(df)
+        
+        county_data = county_agg.nlargest(top_n, 'value_score')
+        
+        return self._bar_chart(
+            county_data['county'].to_numpy(),
+            county_data['value_score'].to_numpy(),
+            colorscale='Blues',
+            x_label='County/City',
+            y_label='Average Value Score',
             title='County-Level Analysis (Dynamic)'
         )
-        return fig
     
     def create_neighborhood_detail_chart(self, df: pd.DataFrame, selected_county: str):
         """Create detailed chart of neighborhoods within a selected county."""
         # Filter neighborhoods for the selected county
-        df_copy = df.copy()
-        df_copy['county'] = df_copy['name'].str.extract(r'\(([^)]+)\)')[0]
-        county_neighborhoods = df_copy[df_copy['county'] == selected_county].copy()
+        county_neighborhoods = df[df['county'] == selected_county]
         
         if county_neighborhoods.empty:
             return None
@@ -179,73 +245,54 @@ class Visualizer:
         # Sort by value score
         county_neighborhoods = county_neighborhoods.sort_values('value_score', ascending=False)
         
-        fig = px.bar(
-            county_neighborhoods,
-            x='name',
-            y='value_score',
-            color='value_score',
-            labels={'value_score': 'Value Score', 'name': 'Neighborhood'},
-            color_continuous_scale='Viridis',
-            text='value_score',
-            hover_data={'median_rent': ':$,.0f', 'affordability': ':.1f'}
-        )
-        fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig.update_layout(
-            height=500,
-            showlegend=False,
-            xaxis_tickangle=-45,
-            xaxis_title='Neighborhood',
-            yaxis_title='Value Score',
-            title=f'Neighborhoods in {selected_county}'
+        return self._bar_chart(
+            county_neighborhoods['name'].to_numpy(),
+            county_neighborhoods['value_score'].to_numpy(),
+            colorscale='Viridis',
+            x_label='Neighborhood',
+            y_label='Value Score',
+            title=f'Neighborhoods in {selected_county}',
+            hover={
+                'Median Rent': (county_neighborhoods['median_rent'].to_numpy(), '$,.0f'),
+                'Affordability': (county_neighborhoods['affordability'].to_numpy(), '.1f')
+            }
         )
-        return fig
     
     def create_city_fixed_chart(self):
         """Create fixed bar chart showing parent cities only (not affected by filters)."""
         # Fixed city-level data for California major cities
-        city_data = pd.DataFrame({
-            'city': ['Los Angeles County', 'San Francisco County', 'San Diego County', 'Santa Clara County', 'Alameda County'],
-            'avg_value_score': [78.5, 82.3, 80.1, 85.2, 79.8],
-            'avg_rent': [2450, 3200, 2650, 2950, 2750]
-        })
+        cities = np.array(['Los Angeles County', 'San Francisco County', 'San Diego County',
+                           'Santa Clara County', 'Alameda County'])
+        avg_value_scores = np.array([78.5, 82.3, 80.1, 85.2, 79.8])
+        avg_rents = np.array([2450, 3200, 2650, 2950, 2750])
         
-        fig = px.bar(
-            city_data,
-            x='city',
-            y='avg_value_score',
-            color='avg_value_score',
-            labels={'avg_value_score': 'Average Value Score', 'city': 'County'},
-            color_continuous_scale='Greens',
-            text='avg_value_score',
-            hover_data={'avg_rent': ':$,.0f'}
-        )
-        fig.update_traces(texttemplate='%{text:.1f}', textposition='outside')
-        fig.update_layout(
-            height=500,
-            showlegend=False,
-            xaxis_tickangle=-45,
-            xaxis_title='County (Parent Level)',
-            yaxis_title='Average Value Score',
-            title='Parent Counties (Fixed)'
+        fig = self._bar_chart(
+            cities,
+            avg_value_scores,
+            colorscale='Greens',
+            x_label='County',
+            y_label='Average Value Score',
+            title='Parent Counties (Fixed)',
+            hover={'Average Rent': (avg_rents, '$,.0f')}
         )
+        fig.update_layout(xaxis_title='County (Parent Level)')
         return fig
     
     def create_hierarchical_metrics_chart(self, df: pd.DataFrame, top_n: int = 10):
         """Create grouped bar chart showing all key metrics by neighborhood."""
-        data = df.head(top_n).copy()
+        data = df.head(top_n)
         
-        # Prepare data for grouped bar chart
-        metrics_data = []
-        for _, row in data.iterrows():
-            metrics_data.extend([
-                {'Neighborhood': row['name'], 'Metric': 'Affordability', 'Score': row['affordability']},
-                {'Neighborhood': row['name'], 'Metric': 'Amenities', 'Score': row['amenity_score']},
-                {'Neighborhood': row['name'], 'Metric': 'Transit', 'Score': row['transit_score']},
-                {'Neighborhood': row['name'], 'Metric': 'Safety', 'Score': row['safety_score']},
-                {'Neighborhood': row['name'], 'Metric': 'Growth', 'Score': row['growth_potential']},
-            ])
-        
-        metrics_df = pd.DataFrame(metrics_data)
+        # Prepare long-form data for grouped bar chart
+        metrics_df = data[
+            ['name', 'affordability', 'amenity_score', 'transit_score', 'safety_score', 'growth_potential']
+        ].rename(columns={
+            'name': 'Neighborhood',
+            'affordability': 'Affordability',
+            'amenity_score': 'Amenities',
+            'transit_score': 'Transit',
+            'safety_score': 'Safety',
+            'growth_potential': 'Growth'
+        }).melt(id_vars='Neighborhood', var_name='Metric', value_name='Score')
         
         fig = px.bar(
             metrics_df,
@@ -277,20 +324,25 @@ class Visualizer:
         
         return fig
 
+# Stateless helpers shared by every rerun and session
+PROCESSOR = DataProcessor()
+ANALYZER = NeighborhoodAnalyzer()
+VIZ = Visualizer()
+
 # ========== SQLite Database Functions ==========
 
 class DatabaseManager:
     """Manages SQLite database for rental data."""
     
-    def __init__(self, db_path="rental_data.db"):
-        """Initialize database connection."""
+    def __init__(self, db_path="file::memory:?cache=shared"):
+        """Initialize database connection (shared in-memory database by default)."""
         self.db_path = db_path
         self.conn = None
         self.cursor = None
     
     def connect(self):
         """Create database connection."""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
         self.cursor = self.conn.cursor()
         return self.conn
     
@@ -316,20 +368,27 @@ class DatabaseManager:
                 school_score REAL,
                 growth_potential REAL,
                 affordability REAL,
+                bedrooms TEXT,
                 value_score REAL,
                 rank INTEGER
             )
         ''')
+        # Indexes for the county/budget filters and value_score ordering
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_county_rent ON neighborhoods(county, median_rent)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_rent ON neighborhoods(median_rent)')
+        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_value ON neighborhoods(value_score DESC)')
         self.conn.commit()
     
     def insert_data(self, df: pd.DataFrame):
         """Insert DataFrame into database."""
-        # Clear existing data
+        # Clear existing rows and bulk insert into the pre-created schema; to_sql commits both
+        # (multi-row INSERTs stay under SQLite's 999 bound-parameter limit)
         self.cursor.execute('DELETE FROM neighborhoods')
+        df.to_sql('neighborhoods', self.conn, if_exists='append', index=False,
+                  method='multi', chunksize=max(1, 999 // len(df.columns)))
         
-        # Insert new data
-        df.to_sql('neighborhoods', self.conn, if_exists='replace', index=False)
-        self.conn.commit()
+        # Refresh planner statistics so the indexes get used
+        self.cursor.execute('ANALYZE neighborhoods')
     
     def query_all_neighborhoods(self):
         """Query all neighborhoods from database."""
@@ -348,23 +407,29 @@ class DatabaseManager:
         '''
         return pd.read_sql_query(query, self.conn, params=(county,))
     
-    def query_by_budget(self, max_rent: float):
-        """Query neighborhoods within budget using SQL WHERE clause."""
+    def query_top_by_budget(self, max_rent: float, county: str = None, top_n: int = None):
+        """Query the best-value neighborhoods within budget, optionally in one county and limited to top_n."""
         query = '''
             SELECT * FROM neighborhoods
             WHERE median_rent <= ?
-            ORDER BY value_score DESC
         '''
-        return pd.read_sql_query(query, self.conn, params=(max_rent,))
+        params = (max_rent,)
+        if county is not None:
+            query += ' AND county = ?'
+            params += (county,)
+        query += ' ORDER BY value_score DESC'
+        if top_n is not None:
+            query += ' LIMIT ?'
+            params += (top_n,)
+        return pd.read_sql_query(query, self.conn, params=params)
     
-    def query_by_county_and_budget(self, county: str, max_rent: float):
-        """Query neighborhoods by county and budget using SQL WHERE clauses."""
-        query = '''
-            SELECT * FROM neighborhoods
-            WHERE county = ? AND median_rent <= ?
-            ORDER BY value_score DESC
-        '''
-        return pd.read_sql_query(query, self.conn, params=(county, max_rent))
+    def query_by_budget(self, max_rent: float, limit: int = None):
+        """Query neighborhoods within budget using SQL WHERE clause (optionally top `limit` only)."""
+        return self.query_top_by_budget(max_rent, top_n=limit)
+    
+    def query_by_county_and_budget(self, county: str, max_rent: float, limit: int = None):
+        """Query neighborhoods by county and budget using SQL WHERE clauses (optionally top `limit` only)."""
+        return self.query_top_by_budget(max_rent, county=county, top_n=limit)
     
     def query_top_counties(self, top_n: int = 10):
         """Query top counties by average value score using SQL aggregation."""
@@ -380,7 +445,7 @@ class DatabaseManager:
             ORDER BY avg_value_score DESC
             LIMIT ?
         '''
-        return pd.read_sql_query(query, self.conn, params=(top_n,))
+        return self._fetch_df(query, (top_n,))
     
     def query_county_stats(self, county: str):
         """Get statistics for a specific county using SQL aggregation."""
@@ -397,7 +462,17 @@ class DatabaseManager:
             WHERE county = ?
             GROUP BY county
         '''
-        return pd.read_sql_query(query, self.conn, params=(county,))
+        return self._fetch_df(query, (county,))
+    
+    def query_sample_records(self, limit: int = 10):
+        """Query the first rows of the neighborhoods table."""
+        return self._fetch_df('SELECT * FROM neighborhoods LIMIT ?', (limit,))
+    
+    def _fetch_df(self, query: str, params: tuple = ()):
+        """Run a small query on the raw cursor and build the DataFrame directly from the rows."""
+        cursor = self.conn.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
     
     def close(self):
         """Close database connection."""
@@ -430,136 +505,240 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Recommendation card tiers: scores below RATING_THRESHOLDS[0] use RATING_STYLES[0], and so on
+RATING_THRESHOLDS = np.array([65, 75, 85])
+RATING_STYLES = [  # (color, rating, bg_color)
+    ("#6B7280", "Fair", "#F3F4F6"),       # Gray
+    ("#F59E0B", "Good", "#FEF3C7"),       # Orange
+    ("#3B82F6", "Great", "#DBEAFE"),      # Blue
+    ("#10B981", "Excellent", "#D1FAE5"),  # Green
+]
+
+# Color-coded recommendation card header with rating tile
+CARD_HEADER_HTML = """
+<div style="background: linear-gradient(90deg, {bg_color} 0%, white 100%); 
+            padding: 15px; 
+            border-radius: 10px; 
+            border-left: 5px solid {color};
+            margin-bottom: 10px;">
+    <div style="display: flex; align-items: center; justify-content: space-between;">
+        <h3 style="margin: 0; color: #1F2937;">#{idx} {name}</h3>
+        <div style="background-color: {color}; 
+                    color: white; 
+                    padding: 8px 20px; 
+                    border-radius: 20px; 
+                    font-weight: bold;
+                    font-size: 14px;">
+            {rating} - {score:.1f}
+        </div>
+    </div>
+</div>
+"""
+
 # Removed external data collectors - using sample data only
 
-@st.cache_data
-def load_sample_data(city_selection="All California"):
-    """Load sample neighborhood data for demonstration."""
-    np.random.seed(42)
-    
-    # California neighborhoods by city
-    ca_neighborhoods = {
-        'Los Angeles': [
-            ("Hollywood", 34.0928, -118.3287),
-            ("Beverly Hills", 34.0736, -118.4004),
-            ("Santa Monica", 34.0195, -118.4912),
-            ("Downtown LA", 34.0522, -118.2437),
-            ("Venice", 33.9850, -118.4695),
-            ("Silver Lake", 34.0870, -118.2704),
-            ("Echo Park", 34.0780, -118.2607),
-            ("Pasadena", 34.1478, -118.1445),
-            ("West Hollywood", 34.0900, -118.3617),
-            ("Koreatown", 34.0579, -118.3009),
-            ("Los Feliz", 34.1071, -118.2828),
-            ("Culver City", 34.0211, -118.3965),
-            ("Manhattan Beach", 33.8847, -118.4109),
-            ("Long Beach", 33.7701, -118.1937),
-            ("Burbank", 34.1808, -118.3090),
-            ("Glendale", 34.1425, -118.2551),
-            ("Sherman Oaks", 34.1508, -118.4490),
-            ("Studio City", 34.1486, -118.3965),
-            ("Westwood", 34.0633, -118.4456),
-            ("Brentwood", 34.0536, -118.4772),
-        ],
-        'San Francisco': [
-            ("Mission District", 37.7599, -122.4148),
-            ("SoMa", 37.7749, -122.4194),
-            ("Castro", 37.7609, -122.4350),
-            ("Pacific Heights", 37.7931, -122.4358),
-            ("Marina District", 37.8024, -122.4381),
-            ("Nob Hill", 37.7919, -122.4155),
-            ("Chinatown", 37.7941, -122.4078),
-            ("North Beach", 37.8006, -122.4104),
-            ("Haight-Ashbury", 37.7692, -122.4481),
-            ("Russian Hill", 37.8003, -122.4200),
-            ("Richmond District", 37.7787, -122.4645),
-            ("Sunset District", 37.7479, -122.4822),
-            ("Potrero Hill", 37.7578, -122.3979),
-            ("Bernal Heights", 37.7418, -122.4157),
-            ("Glen Park", 37.7326, -122.4339),
-        ],
-        'San Diego': [
-            ("Gaslamp Quarter", 32.7115, -117.1597),
-            ("La Jolla", 32.8328, -117.2713),
-            ("Pacific Beach", 32.7967, -117.2357),
-            ("Mission Bay", 32.7642, -117.2267),
-            ("Hillcrest", 32.7486, -117.1664),
-            ("North Park", 32.7411, -117.1297),
-            ("Little Italy", 32.7209, -117.1698),
-            ("Ocean Beach", 32.7475, -117.2489),
-            ("Point Loma", 32.7341, -117.2407),
-            ("Del Mar", 32.9595, -117.2653),
-        ],
-        'San Jose': [
-            ("Downtown San Jose", 37.3382, -121.8863),
-            ("Willow Glen", 37.3044, -121.8896),
-            ("Almaden Valley", 37.2091, -121.8355),
-            ("Rose Garden", 37.3399, -121.9190),
-            ("Santana Row", 37.3207, -121.9483),
-            ("Japantown", 37.3469, -121.8950),
-            ("Cambrian Park", 37.2527, -121.9297),
-            ("Evergreen", 37.3155, -121.7906),
-        ],
-        'Oakland': [
-            ("Lake Merritt", 37.8044, -122.2712),
-            ("Rockridge", 37.8444, -122.2514),
-            ("Temescal", 37.8347, -122.2632),
-            ("Jack London Square", 37.7955, -122.2772),
-            ("Montclair", 37.8322, -122.2097),
-            ("Piedmont Avenue", 37.8197, -122.2458),
-        ],
-    }
+# California neighborhoods by city: (name, latitude, longitude)
+CA_NEIGHBORHOODS = {
+    'Los Angeles': [
+        ("Hollywood", 34.0928, -118.3287),
+        ("Beverly Hills", 34.0736, -118.4004),
+        ("Santa Monica", 34.0195, -118.4912),
+        ("Downtown LA", 34.0522, -118.2437),
+        ("Venice", 33.9850, -118.4695),
+        ("Silver Lake", 34.0870, -118.2704),
+        ("Echo Park", 34.0780, -118.2607),
+        ("Pasadena", 34.1478, -118.1445),
+        ("West Hollywood", 34.0900, -118.3617),
+        ("Koreatown", 34.0579, -118.3009),
+        ("Los Feliz", 34.1071, -118.2828),
+        ("Culver City", 34.0211, -118.3965),
+        ("Manhattan Beach", 33.8847, -118.4109),
+        ("Long Beach", 33.7701, -118.1937),
+        ("Burbank", 34.1808, -118.3090),
+        ("Glendale", 34.1425, -118.2551),
+        ("Sherman Oaks", 34.1508, -118.4490),
+        ("Studio City", 34.1486, -118.3965),
+        ("Westwood", 34.0633, -118.4456),
+        ("Brentwood", 34.0536, -118.4772),
+    ],
+    'San Francisco': [
+        ("Mission District", 37.7599, -122.4148),
+        ("SoMa", 37.7749, -122.4194),
+        ("Castro", 37.7609, -122.4350),
+        ("Pacific Heights", 37.7931, -122.4358),
+        ("Marina District", 37.8024, -122.4381),
+        ("Nob Hill", 37.7919, -122.4155),
+        ("Chinatown", 37.7941, -122.4078),
+        ("North Beach", 37.8006, -122.4104),
+        ("Haight-Ashbury", 37.7692, -122.4481),
+        ("Russian Hill", 37.8003, -122.4200),
+        ("Richmond District", 37.7787, -122.4645),
+        ("Sunset District", 37.7479, -122.4822),
+        ("Potrero Hill", 37.7578, -122.3979),
+        ("Bernal Heights", 37.7418, -122.4157),
+        ("Glen Park", 37.7326, -122.4339),
+    ],
+    'San Diego': [
+        ("Gaslamp Quarter", 32.7115, -117.1597),
+        ("La Jolla", 32.8328, -117.2713),
+        ("Pacific Beach", 32.7967, -117.2357),
+        ("Mission Bay", 32.7642, -117.2267),
+        ("Hillcrest", 32.7486, -117.1664),
+        ("North Park", 32.7411, -117.1297),
+        ("Little Italy", 32.7209, -117.1698),
+        ("Ocean Beach", 32.7475, -117.2489),
+        ("Point Loma", 32.7341, -117.2407),
+        ("Del Mar", 32.9595, -117.2653),
+    ],
+    'San Jose': [
+        ("Downtown San Jose", 37.3382, -121.8863),
+        ("Willow Glen", 37.3044, -121.8896),
+        ("Almaden Valley", 37.2091, -121.8355),
+        ("Rose Garden", 37.3399, -121.9190),
+        ("Santana Row", 37.3207, -121.9483),
+        ("Japantown", 37.3469, -121.8950),
+        ("Cambrian Park", 37.2527, -121.9297),
+        ("Evergreen", 37.3155, -121.7906),
+    ],
+    'Oakland': [
+        ("Lake Merritt", 37.8044, -122.2712),
+        ("Rockridge", 37.8444, -122.2514),
+        ("Temescal", 37.8347, -122.2632),
+        ("Jack London Square", 37.7955, -122.2772),
+        ("Montclair", 37.8322, -122.2097),
+        ("Piedmont Avenue", 37.8197, -122.2458),
+    ],
+}
+
+COUNTIES = list(CA_NEIGHBORHOODS)
+
+# (names, county codes, latitudes, longitudes) arrays across every city, built once at import
+ALL_CALIFORNIA_ARRAYS = (
+    np.array([f"{name} ({city})" for city, areas in CA_NEIGHBORHOODS.items() for name, _, _ in areas],
+             dtype=object),
+    np.repeat(np.arange(len(COUNTIES), dtype=np.int8), [len(areas) for areas in CA_NEIGHBORHOODS.values()]),
+    np.array([lat for areas in CA_NEIGHBORHOODS.values() for _, lat, _ in areas], dtype=np.float64),
+    np.array([lon for areas in CA_NEIGHBORHOODS.values() for _, _, lon in areas], dtype=np.float64)
+)
+
+# Simulated columns: (low, high, dtype); integer columns exclude high like Generator.integers
+SAMPLE_COLUMNS = {
+    'total_population': (5000, 50000, np.int32),
+    'median_income': (40000, 150000, np.int32),
+    'median_rent': (1000, 4000, np.int32),
+    'median_age': (25, 45, np.int32),
+    'college_educated_pct': (20, 80, np.float32),
+    'renter_pct': (30, 90, np.float32),
+    'unemployment_rate': (2, 10, np.float32),
+    'amenity_score': (40, 95, np.float32),
+    'transit_score': (30, 95, np.float32),
+    'safety_score': (50, 95, np.float32),
+    'school_score': (50, 95, np.float32),  # School quality score (simulated GreatSchools API data)
+    'growth_potential': (40, 85, np.float32),
+}
+SAMPLE_LOWS = np.array([low for low, _, _ in SAMPLE_COLUMNS.values()], dtype=np.float64)[:, None]
+SAMPLE_SPANS = np.array([high - low for low, high, _ in SAMPLE_COLUMNS.values()], dtype=np.float64)[:, None]
+
+@st.cache_resource
+def load_sample_data():
+    """Load the ranked All California sample data, built once per process.
     
-    # Select neighborhoods based on user choice
-    if city_selection == "All California":
-        neighborhoods = []
-        for city, areas in ca_neighborhoods.items():
-            neighborhoods.extend([(f"{name} ({city})", lat, lon) for name, lat, lon in areas])
-    else:
-        neighborhoods = [(f"{name} ({city_selection})", lat, lon) 
-                        for name, lat, lon in ca_neighborhoods.get(city_selection, [])]
+    The frame is shared by every session; call .copy() before mutating it.
+    """
+    rng = np.random.default_rng(42)
+    
+    names, county_codes, lats, lons = ALL_CALIFORNIA_ARRAYS
+    n = len(names)
     
-    n = len(neighborhoods)
-    names, lats, lons = zip(*neighborhoods) if neighborhoods else ([], [], [])
+    # Draw every simulated column from one uniform block (one row per column) and rescale
+    samples = rng.random((len(SAMPLE_COLUMNS), n)) * SAMPLE_SPANS + SAMPLE_LOWS
     
+    # Every column is built with its final dtype, so construction needs no inference pass
     data = {
-        'name': list(names),
-        'latitude': list(lats),
-        'longitude': list(lons),
-        'total_population': np.random.randint(5000, 50000, n),
-        'median_income': np.random.randint(40000, 150000, n),
-        'median_rent': np.random.randint(1000, 4000, n),
-        'median_age': np.random.randint(25, 45, n),
-        'college_educated_pct': np.random.uniform(20, 80, n),
-        'renter_pct': np.random.uniform(30, 90, n),
-        'unemployment_rate': np.random.uniform(2, 10, n),
-        'amenity_score': np.random.uniform(40, 95, n),
-        'transit_score': np.random.uniform(30, 95, n),
-        'safety_score': np.random.uniform(50, 95, n),
-        'school_score': np.random.uniform(50, 95, n),  # School quality score (simulated GreatSchools API data)
-        'growth_potential': np.random.uniform(40, 85, n),
+        'name': names,
+        'latitude': lats,
+        'longitude': lons,
     }
+    for row, (column, (_, _, dtype)) in zip(samples, SAMPLE_COLUMNS.items()):
+        # Flooring makes integer columns uniform over [low, high)
+        data[column] = (np.floor(row) if dtype is np.int32 else row).astype(dtype)
     
-    df = pd.DataFrame(data)
+    # County comes straight from the catalogue, never parsed back out of the name
+    data['county'] = pd.Categorical.from_codes(county_codes, categories=COUNTIES)
     
     # Calculate affordability
-    processor = DataProcessor()
-    df['affordability'] = df.apply(
-        lambda row: processor.calculate_affordability_index(
-            row['median_rent'], row['median_income']
-        ), axis=1
+    data['affordability'] = PROCESSOR.calculate_affordability_index_vec(
+        data['median_rent'], data['median_income']
     )
     
     # Add bedroom data (simulated for demo - would come from rental listings API)
     bedroom_options = ['Studio', '1BR', '2BR', '3BR', '4BR']
-    df['bedrooms'] = np.random.choice(bedroom_options, n)
+    data['bedrooms'] = pd.Categorical(rng.choice(bedroom_options, n), categories=bedroom_options)
+    
+    df = pd.DataFrame(data)
     
     # Calculate value scores
-    analyzer = NeighborhoodAnalyzer()
-    df = analyzer.rank_neighborhoods(df)
+    df = ANALYZER.rank_neighborhoods(df)
     
     return df
 
+@st.cache_resource
+def get_db():
+    """Create the database once per process and populate it with the ranked sample data."""
+    db = DatabaseManager()
+    db.connect()
+    db.create_table()
+    db.insert_data(load_sample_data())
+    return db
+
+@st.cache_data
+def best_value_cached(max_rent: float, county: str = None, top_n: int = 10) -> Tuple[pd.DataFrame, Dict]:
+    """Best-value neighborhoods, scored with the default weights like the stored value_score."""
+    return ANALYZER.find_best_value_neighborhoods(
+        load_sample_data(), max_rent, top_n=top_n, county=county
+    )
+
+# The neighborhoods table is static for the life of the process, so everything derived from it
+# is a shared resource built once; the figures are returned as-is and must not be mutated
+@st.cache_resource
+def load_all_neighborhoods():
+    """Every database row, with county as a categorical."""
+    df = get_db().query_all_neighborhoods()
+    df['county'] = df['county'].astype('category')
+    return df
+
+@st.cache_resource
+def load_county_agg():
+    """County averages over the full table, shared by the overview metrics and charts."""
+    return VIZ.aggregate_counties(load_all_neighborhoods())
+
+@st.cache_resource
+def cached_overview_chart(top_n: int = 10):
+    """California overview chart, built once per top_n."""
+    return VIZ.create_california_overview_chart(None, top_n=top_n, county_agg=load_county_agg())
+
+@st.cache_resource(max_entries=16)
+def cached_county_neighborhoods_chart(county: str, max_rent: float, top_n: int = 5):
+    """Top neighborhoods chart for one county within budget, queried from the database."""
+    top_county_df = get_db().query_top_by_budget(max_rent, county=county, top_n=top_n)
+    return VIZ.create_county_neighborhoods_chart(top_county_df, county, top_n=top_n)
+
+# Cached read-only queries for the SQL tab; the connection comes from get_db() so it is never hashed
+@st.cache_data(ttl=600)
+def cached_top_counties(top_n: int = 10):
+    """Top counties by average value score, cached per top_n."""
+    return get_db().query_top_counties(top_n=top_n)
+
+@st.cache_data(ttl=600)
+def cached_county_stats(county: str):
+    """County statistics, cached per county."""
+    return get_db().query_county_stats(county)
+
+@st.cache_data(ttl=600)
+def cached_sample_records(limit: int = 10):
+    """First rows of the neighborhoods table."""
+    return get_db().query_sample_records(limit)
+
 def main():
     """Main application function."""
     
@@ -583,23 +762,11 @@ def main():
         """)
     
     # ========== INITIALIZE DATABASE ==========
-    # Initialize database manager
-    db = DatabaseManager()
-    db.connect()
-    db.create_table()
-    
-    # Load sample data and populate database
-    neighborhoods_df = load_sample_data("All California")
-    
-    # Calculate rankings
-    analyzer = NeighborhoodAnalyzer()
-    neighborhoods_df = analyzer.rank_neighborhoods(neighborhoods_df)
-    
-    # Extract counties
-    neighborhoods_df['county'] = neighborhoods_df['name'].str.extract(r'\(([^)]+)\)')[0]
+    # Database is created and populated once per process
+    db = get_db()
     
-    # Insert data into SQLite database
-    db.insert_data(neighborhoods_df)
+    # Load sample data (already ranked)
+    neighborhoods_df = load_sample_data()
     
     st.success("✅ Database initialized and populated with neighborhood data")
     
@@ -635,6 +802,10 @@ def main():
         help="Filter by number of bedrooms"
     )
     
+    # Table size (bounds how many rows each table sends to the browser)
+    st.sidebar.subheader("Display")
+    page_size = st.sidebar.number_input("Rows per table", min_value=10, max_value=200, value=10, step=5)
+    
     # Priority weights
     st.sidebar.subheader("Your Priorities")
     st.sidebar.markdown("*Adjust importance of each factor*")
@@ -660,22 +831,26 @@ def main():
             'growth': growth_weight / total_weight
         }
     
-    # ========== QUERY DATA FROM DATABASE USING SQL ==========
-    # Query neighborhoods from database based on filters
+    # ========== ACTIVE QUERY ==========
+    # SQL for the current filters, shown on the SQL tab; its row count is the match count below
     if selected_county != "All California":
-        filtered_df = db.query_by_county_and_budget(selected_county, budget)
         sql_query_used = f"""SELECT * FROM neighborhoods
-WHERE county = '{selected_county}' AND median_rent <= {budget}
+WHERE median_rent <= {budget} AND county = '{selected_county}'
 ORDER BY value_score DESC"""
     else:
-        filtered_df = db.query_by_budget(budget)
         sql_query_used = f"""SELECT * FROM neighborhoods
 WHERE median_rent <= {budget}
 ORDER BY value_score DESC"""
     
     # Get all data for California overview chart
-    all_neighborhoods_df = db.query_all_neighborhoods()
-    budget_filtered_df = filtered_df.copy()
+    all_neighborhoods_df = load_all_neighborhoods()
+    
+    # Top Neighborhoods tab: filter by budget and keep only the rows it displays (cached per filter)
+    budget_filtered_df, budget_matches = best_value_cached(
+        budget,
+        county=None if selected_county == "All California" else selected_county,
+        top_n=max(5, page_size)
+    )
     
     # ========== CREATE TABS ==========
     tab1, tab2, tab3 = st.tabs(["🏠 Welcome Overview", "📊 Top Neighborhoods", "💾 SQL Database Analysis"])
@@ -685,32 +860,38 @@ ORDER BY value_score DESC"""
         st.header("California Rental Market Overview")
         st.markdown("**Explore rental trends across California counties and neighborhoods**")
         
-        # Key metrics
+        # County averages are computed once and shared by the metrics and county-level charts
+        county_agg = load_county_agg()
+        
+        # Key metrics, reduced directly over the column arrays
+        all_rents = all_neighborhoods_df['median_rent'].to_numpy()
+        all_value_scores = all_neighborhoods_df['value_score'].to_numpy()
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
                 "Total Neighborhoods",
-                f"{len(all_neighborhoods_df)}",
+                f"{all_rents.size}",
                 delta="All California"
             )
         
         with col2:
             st.metric(
                 "Average Rent",
-                f"${all_neighborhoods_df['median_rent'].mean():.0f}"
+                f"${all_rents.mean():.0f}"
             )
         
         with col3:
             st.metric(
                 "Avg Value Score",
-                f"{all_neighborhoods_df['value_score'].mean():.1f}"
+                f"{all_value_scores.mean():.1f}"
             )
         
         with col4:
             st.metric(
                 "Counties",
-                f"{all_neighborhoods_df['county'].nunique()}"
+                f"{len(county_agg)}"
             )
         
         st.markdown("---")
@@ -718,12 +899,10 @@ ORDER BY value_score DESC"""
         # Two visualization columns
         col1, col2 = st.columns(2)
         
-        viz = Visualizer()
-        
         with col1:
             st.subheader("Top 10 California Counties")
             st.caption("📊 Data Source: SQL aggregation query (GROUP BY county)")
-            fig1 = viz.create_california_overview_chart(all_neighborhoods_df, top_n=10)
+            fig1 = cached_overview_chart(top_n=10)
             st.plotly_chart(fig1, use_container_width=True)
         
         with col2:
@@ -731,7 +910,7 @@ ORDER BY value_score DESC"""
             st.caption("📊 Data Source: SQL filtered query (WHERE county = ?)")
             if selected_county != "All California":
                 if len(budget_filtered_df) > 0:
-                    fig2 = viz.create_county_neighborhoods_chart(budget_filtered_df, selected_county, top_n=5)
+                    fig2 = cached_county_neighborhoods_chart(selected_county, budget, top_n=5)
                     st.plotly_chart(fig2, use_container_width=True)
                 else:
                     st.info(f"No neighborhoods found in {selected_county} within ${budget} budget.")
@@ -745,92 +924,59 @@ ORDER BY value_score DESC"""
     with tab2:
         st.header("Top Neighborhoods for Your Budget")
         
-        # Key metrics
+        # Key metrics over every matching neighborhood (not just the displayed top rows)
+        found_count = budget_matches['count']
+        if found_count > 0:
+            avg_rent = f"${budget_matches['median_rent']:.0f}"
+            avg_value_score = f"{budget_matches['value_score']:.1f}"
+            avg_affordability = f"{budget_matches['affordability']:.0f}"
+        else:
+            avg_rent = avg_value_score = avg_affordability = "N/A"
+        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
                 "Neighborhoods Found",
-                f"{len(budget_filtered_df)}",
+                f"{found_count}",
                 delta=f"Within ${budget}"
             )
         
         with col2:
-            if len(budget_filtered_df) > 0:
-                st.metric(
-                    "Average Rent",
-                    f"${budget_filtered_df['median_rent'].mean():.0f}"
-                )
-            else:
-                st.metric("Average Rent", "N/A")
+            st.metric("Average Rent", avg_rent)
         
         with col3:
-            if len(budget_filtered_df) > 0:
-                st.metric(
-                    "Avg Value Score",
-                    f"{budget_filtered_df['value_score'].mean():.1f}"
-                )
-            else:
-                st.metric("Avg Value Score", "N/A")
+            st.metric("Avg Value Score", avg_value_score)
         
         with col4:
-            if len(budget_filtered_df) > 0:
-                st.metric(
-                    "Avg Affordability",
-                    f"{budget_filtered_df['affordability'].mean():.0f}"
-                )
-            else:
-                st.metric("Avg Affordability", "N/A")
+            st.metric("Avg Affordability", avg_affordability)
         
         st.markdown("---")
         
         # Display top recommendations
-        if len(budget_filtered_df) > 0:
+        if found_count > 0:
             st.subheader("Top Recommendations")
         
         top_neighborhoods = budget_filtered_df.head(5)
         
-        for idx, (_, neighborhood) in enumerate(top_neighborhoods.iterrows(), 1):
+        tiers = np.searchsorted(RATING_THRESHOLDS, top_neighborhoods['value_score'].to_numpy(), side='right')
+        
+        card_rows = top_neighborhoods[[
+            'name', 'median_rent', 'value_score', 'affordability', 'amenity_score',
+            'transit_score', 'safety_score', 'school_score', 'growth_potential'
+        ]].to_dict('records')
+        
+        for idx, (neighborhood, tier) in enumerate(zip(card_rows, tiers), 1):
             # Determine color based on value score
             score = neighborhood['value_score']
-            if score >= 85:
-                color = "#10B981"  # Green - Excellent
-                rating = "Excellent"
-                bg_color = "#D1FAE5"
-            elif score >= 75:
-                color = "#3B82F6"  # Blue - Great
-                rating = "Great"
-                bg_color = "#DBEAFE"
-            elif score >= 65:
-                color = "#F59E0B"  # Orange - Good
-                rating = "Good"
-                bg_color = "#FEF3C7"
-            else:
-                color = "#6B7280"  # Gray - Fair
-                rating = "Fair"
-                bg_color = "#F3F4F6"
+            color, rating, bg_color = RATING_STYLES[tier]
             
             with st.container():
                 # Color-coded header with rating tile
-                st.markdown(f"""
-                <div style="background: linear-gradient(90deg, {bg_color} 0%, white 100%); 
-                            padding: 15px; 
-                            border-radius: 10px; 
-                            border-left: 5px solid {color};
-                            margin-bottom: 10px;">
-                    <div style="display: flex; align-items: center; justify-content: space-between;">
-                        <h3 style="margin: 0; color: #1F2937;">#{idx} {neighborhood['name']}</h3>
-                        <div style="background-color: {color}; 
-                                    color: white; 
-                                    padding: 8px 20px; 
-                                    border-radius: 20px; 
-                                    font-weight: bold;
-                                    font-size: 14px;">
-                            {rating} - {score:.1f}
-                        </div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(CARD_HEADER_HTML.format(
+                    color=color, bg_color=bg_color, rating=rating,
+                    idx=idx, name=neighborhood['name'], score=score
+                ), unsafe_allow_html=True)
                 
                 # Metrics row
                 col1, col2, col3 = st.columns(3)
@@ -860,7 +1006,8 @@ ORDER BY value_score DESC"""
                     st.caption(f"Growth: {neighborhood['growth_potential']:.0f}")
                 
                 st.markdown("---")
-            
+        
+        if found_count > 0:
             # Data table
             st.subheader("Detailed Data")
             display_cols = [
@@ -868,8 +1015,11 @@ ORDER BY value_score DESC"""
                 'amenity_score', 'transit_score', 'safety_score',
                 'value_score', 'rank'
             ]
+            # Widen float32 scores first: rounding in float32 lands on values like 91.69999694824219
+            detail_df = budget_filtered_df[display_cols].head(page_size)
+            float32_cols = detail_df.select_dtypes(include=np.float32).columns
             st.dataframe(
-                budget_filtered_df[display_cols].head(10).round(1),
+                detail_df.astype(dict.fromkeys(float32_cols, np.float64)).round(1),
                 use_container_width=True,
                 hide_index=True
             )
@@ -881,7 +1031,7 @@ ORDER BY value_score DESC"""
         st.header("SQL Database Analysis")
         st.markdown("**View live database queries and statistics**")
         
-        st.success("✅ Connected to SQLite Database: `rental_data.db`")
+        st.success("✅ Connected to in-memory SQLite Database")
         
         # Current Query Section
         st.subheader("Current Active Query")
@@ -889,7 +1039,7 @@ ORDER BY value_score DESC"""
         
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Records Returned", len(budget_filtered_df))
+            st.metric("Records Returned", budget_matches['count'])
         with col2:
             st.metric("Database Size", f"{len(all_neighborhoods_df)} total records")
         
@@ -902,7 +1052,7 @@ ORDER BY value_score DESC"""
         
         with col1:
             st.markdown("**Top 10 Counties Query:**")
-            county_stats_df = db.query_top_counties(top_n=10)
+            county_stats_df = cached_top_counties(top_n=10)
             st.code("""
 SELECT 
     county,
@@ -914,12 +1064,12 @@ GROUP BY county
 ORDER BY avg_value_score DESC
 LIMIT 10
             """, language="sql")
-            st.dataframe(county_stats_df, use_container_width=True, hide_index=True)
+            st.dataframe(county_stats_df.head(page_size).round(1), use_container_width=True, hide_index=True)
         
         with col2:
             if selected_county != "All California":
                 st.markdown(f"**{selected_county} Statistics Query:**")
-                county_detail = db.query_county_stats(selected_county)
+                county_detail = cached_county_stats(selected_county)
                 st.code(f"""
 SELECT 
     county,
@@ -932,7 +1082,7 @@ FROM neighborhoods
 WHERE county = '{selected_county}'
 GROUP BY county
                 """, language="sql")
-                st.dataframe(county_detail, use_container_width=True, hide_index=True)
+                st.dataframe(county_detail.head(page_size).round(1), use_container_width=True, hide_index=True)
             else:
                 st.info("💡 Select a county to view detailed statistics")
         
@@ -940,14 +1090,11 @@ GROUP BY county
         
         # Sample data from database
         st.subheader("Sample Database Records")
-        st.caption("First 10 records from the neighborhoods table")
-        sample_query = "SELECT * FROM neighborhoods LIMIT 10"
+        st.caption(f"First {page_size} records from the neighborhoods table")
+        sample_query = f"SELECT * FROM neighborhoods LIMIT {page_size}"
         st.code(sample_query, language="sql")
-        sample_df = pd.read_sql_query(sample_query, db.conn)
-        st.dataframe(sample_df, use_container_width=True, hide_index=True)
-    
-    # Close database connection
-    db.close()
+        sample_df = cached_sample_records(page_size)
+        st.dataframe(sample_df.round(1), use_container_width=True, hide_index=True)
     
     # Footer
     st.markdown("---")